@@ -1,19 +1,132 @@
 """Database connection and query handling with psycopg3"""
 
 import json
+import mmap
+import os
 import re
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, Any, Callable, TYPE_CHECKING
+from dataclasses import dataclass, replace
+from functools import cached_property
 
-import psycopg
-from psycopg import sql
-from psycopg.rows import dict_row
+import orjson
+import sqlparse
+from sqlparse.exceptions import SQLParseError
+from sqlparse.sql import Where
+from sqlparse.tokens import Comment, Keyword, Punctuation
 
-CONNECTIONS_FILE = Path(__file__).parent / "connections.json"
+# psycopg (and libpq) is imported on first connect to keep app start-up lean
+if TYPE_CHECKING:
+    import psycopg
+    from psycopg import sql
+    from psycopg_pool import ConnectionPool
 
+CONNECTIONS_FILE = Path(__file__).parent / "connections.jsonl"
+LEGACY_CONNECTIONS_FILE = Path(__file__).parent / "connections.json"
 
-@dataclass
+# Pool sizing per (host, port, user, password, dbname)
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 4
+POOL_TIMEOUT = 10.0  # seconds to wait for a free connection
+CONNECT_TIMEOUT = 10  # seconds libpq waits for a server to answer
+
+# Rows fetched per round-trip from server-side cursors
+FETCH_BATCH = 100
+
+# Catalog introspection results are cached per connection for this long
+CACHE_TTL = 60.0  # seconds
+CACHE_MAX_ENTRIES = 1024  # Least recently used lookups are evicted beyond this
+_DDL_RE = re.compile(r"\b(CREATE|ALTER|DROP|TRUNCATE|GRANT|REVOKE|COMMENT)\b", re.IGNORECASE)
+
+
+# Leading whitespace and -- / /* */ comments
+_LEADING_RE = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+
+
+# Leading keywords of row-returning statements, for queries sqlparse can't handle
+_ROW_KEYWORDS = frozenset(("SELECT", "WITH", "VALUES", "TABLE"))
+
+
+def _first_keyword(query: str) -> str:
+    """Leading keyword, uppercased, without copying or uppercasing the whole buffer."""
+    n = len(query)
+    start = _LEADING_RE.match(query).end()
+    end = start
+    while end < n and query[end].isalpha():
+        end += 1
+    return query[start:end].upper()
+
+
+def _is_junk(token: sqlparse.sql.Token) -> bool:
+    """Whitespace, comment or semicolon - nothing the server would execute."""
+    return token.is_whitespace or token.ttype in Comment or token.match(Punctuation, ";")
+
+
+def _strip_query(query: str) -> tuple[str, Optional[sqlparse.sql.Statement]]:
+    """
+    Strip leading/trailing whitespace, comments and semicolons.
+    Returns (query, first statement) - the statement is None for empty input
+    or input too large for sqlparse (run as-is, no auto-LIMIT).
+    """
+    query = _LEADING_RE.sub("", query, count=1).rstrip()
+    # Only the first statement decides the query type; don't lex whole scripts
+    statements = sqlparse.parsestream(query)
+    try:
+        statement = next(statements, None)
+    except SQLParseError:
+        return query, None
+    if statement is None:
+        return query, None
+    
+    # Anything but comments and semicolons after the first statement means
+    # a script - leave it alone (stops lexing at the first real token)
+    try:
+        for rest in statements:
+            if not all(_is_junk(t) for t in rest.flatten()):
+                return query, statement
+    except SQLParseError:
+        return query, statement
+    
+    # Trailing junk found via tokens so "--" inside string literals is safe
+    end = len(str(statement))
+    for token in reversed(list(statement.flatten())):
+        if _is_junk(token):
+            end -= len(token.value)
+        else:
+            break
+    return query[:end], statement
+
+
+def _is_select(query: str, statement: Optional[sqlparse.sql.Statement]) -> bool:
+    """Classify a _strip_query result as row-returning (CTEs included)."""
+    if statement is not None:
+        return statement.get_type() == "SELECT"
+    # Too large for sqlparse (or empty): go by the leading keyword
+    return _first_keyword(query) in _ROW_KEYWORDS
+
+
+def is_select_query(query: str) -> bool:
+    """True if execute_query will run this as a SELECT (streamed, auto-limited)."""
+    return _is_select(*_strip_query(query))
+
+
+def _has_limit(statement: sqlparse.sql.Statement) -> bool:
+    """True if the statement's top level already has LIMIT or FETCH (ignores subqueries and literals)."""
+    for token in statement.tokens:
+        if token.ttype is Keyword and token.normalized in ("LIMIT", "FETCH"):
+            return True
+        # sqlparse's WHERE group runs on through OFFSET/FETCH, so look inside it too
+        if isinstance(token, Where) and any(
+            t.ttype is Keyword and t.normalized in ("LIMIT", "FETCH") for t in token.tokens
+        ):
+            return True
+    return False
+
+
+@dataclass(frozen=True)
 class ConnectionInfo:
     name: str
     host: str = "localhost"
@@ -24,7 +137,15 @@ class ConnectionInfo:
     last_connected_at: Optional[str] = None  # ISO timestamp
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "name": self.name,
+            "host": self.host,
+            "port": self.port,
+            "dbname": self.dbname,
+            "user": self.user,
+            "password": self.password,
+            "last_connected_at": self.last_connected_at,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "ConnectionInfo":
@@ -33,81 +154,205 @@ class ConnectionInfo:
             data["last_connected_at"] = None
         return cls(**data)
     
-    def connection_string(self) -> str:
-        return f"host={self.host} port={self.port} dbname={self.dbname} user={self.user} password={self.password}"
+    @cached_property
+    def kwargs(self) -> dict:
+        """Connection parameters for psycopg.connect(**kwargs)."""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "dbname": self.dbname,
+            "user": self.user,
+            "password": self.password,
+            "connect_timeout": CONNECT_TIMEOUT,
+        }
 
 
 def load_connections() -> list[ConnectionInfo]:
-    """Load saved connections from JSON file."""
-    if not CONNECTIONS_FILE.exists():
-        return []
+    """Load saved connections (one JSON object per line)."""
     try:
-        with open(CONNECTIONS_FILE, "r") as f:
-            data = json.load(f)
-        return [ConnectionInfo.from_dict(c) for c in data]
-    except (json.JSONDecodeError, KeyError):
+        if not CONNECTIONS_FILE.exists():
+            # Older versions stored a single JSON array
+            if LEGACY_CONNECTIONS_FILE.exists():
+                with open(LEGACY_CONNECTIONS_FILE, "rb") as f:
+                    return [ConnectionInfo.from_dict(c) for c in orjson.loads(f.read())]
+            return []
+        with open(CONNECTIONS_FILE, "rb") as f:
+            return [ConnectionInfo.from_dict(orjson.loads(line)) for line in f if line.strip()]
+    except (orjson.JSONDecodeError, json.JSONDecodeError, KeyError, TypeError):
         return []
 
 
 def save_connections(connections: list[ConnectionInfo]) -> None:
-    """Save connections to JSON file."""
-    with open(CONNECTIONS_FILE, "w") as f:
-        json.dump([c.to_dict() for c in connections], f, indent=2)
+    """Save connections atomically (write temp file, then replace)."""
+    tmp = CONNECTIONS_FILE.with_name(CONNECTIONS_FILE.name + ".tmp")
+    with open(tmp, "wb") as f:
+        for c in connections:
+            f.write(orjson.dumps(c.to_dict()) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CONNECTIONS_FILE)
 
 
-def get_last_connection() -> Optional[ConnectionInfo]:
-    """Get the most recently used connection."""
-    connections = load_connections()
-    if not connections:
+def get_last_connection(connections: Optional[list[ConnectionInfo]] = None) -> Optional[ConnectionInfo]:
+    """Get the most recently used connection (from `connections` if already loaded)."""
+    if connections is None:
+        connections = load_connections()
+    # Never-used connections (no timestamp) sort last
+    return max(connections, key=lambda c: c.last_connected_at or "", default=None)
+
+
+def _timestamp_span(buf: mmap.mmap, name: str, width: int) -> Optional[tuple[int, int]]:
+    """Locate the fixed-width last_connected_at value of a connection record."""
+    prefix = b'{"name":' + orjson.dumps(name) + b","
+    key = b'"last_connected_at":"'
+    pos = buf.find(prefix)
+    # Records start at the beginning of a line
+    while pos > 0 and buf[pos - 1] != ord("\n"):
+        pos = buf.find(prefix, pos + 1)
+    if pos < 0:
         return None
-    
-    # Sort by last_connected_at descending, None values last
-    def sort_key(c):
-        return c.last_connected_at or ""
-    
-    sorted_conns = sorted(connections, key=sort_key, reverse=True)
-    return sorted_conns[0] if sorted_conns else None
+    end = buf.find(b"\n", pos)
+    if end < 0:
+        end = len(buf)
+    start = buf.find(key, pos, end)
+    if start < 0:
+        return None
+    start += len(key)
+    if start + width >= end or buf[start + width] != ord('"'):
+        return None
+    return start, start + width
 
 
-def update_connection_timestamp(name: str) -> None:
-    """Update the last_connected_at timestamp for a connection."""
+def update_connection_timestamp(name: str) -> str:
+    """Update the last_connected_at timestamp for a connection and return it."""
     from datetime import datetime
+    timestamp = datetime.now().isoformat(timespec="microseconds")
+    
+    # Fast path: overwrite the fixed-width timestamp in place
+    if CONNECTIONS_FILE.exists() and CONNECTIONS_FILE.stat().st_size > 0:
+        with open(CONNECTIONS_FILE, "r+b") as f, mmap.mmap(f.fileno(), 0) as buf:
+            span = _timestamp_span(buf, name, len(timestamp))
+            if span:
+                buf[span[0]:span[1]] = timestamp.encode()
+                buf.flush()
+                return timestamp
+    
+    # First timestamp for this record (or legacy file) - rewrite everything
     connections = load_connections()
     
-    for conn in connections:
+    for i, conn in enumerate(connections):
         if conn.name == name:
-            conn.last_connected_at = datetime.now().isoformat()
+            connections[i] = replace(conn, last_connected_at=timestamp)
             break
     
     save_connections(connections)
+    return timestamp
 
 
 class Database:
     """Manages PostgreSQL connection and queries."""
     
     def __init__(self):
-        self.conn: Optional[psycopg.Connection] = None
+        self.conn: Optional["psycopg.Connection"] = None
         self.info: Optional[ConnectionInfo] = None
+        # One pool per (host, port, user, password, dbname) so switching databases
+        # reuses an open session instead of a fresh TCP + auth handshake
+        self._pools: dict[tuple[str, int, str, str, str], "ConnectionPool"] = {}
+        self._conn_pool: Optional["ConnectionPool"] = None
+        self._conn_key: Optional[tuple[str, int, str, str, str]] = None
+        # (conn_key, method, *args) -> (timestamp, result)
+        self._cache: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._ddl_pending = False
+        # (schema, table, pk_columns, set columns) -> composed UPDATE
+        self._update_sql_cache: dict[tuple[str, str, tuple[str, ...], tuple[str, ...]], "sql.Composed"] = {}
+        self.server_version = 0
+        self._table_filter = "c.relkind = 'r'"
+    
+    @staticmethod
+    def _key(info: ConnectionInfo) -> tuple[str, int, str, str, str]:
+        # Credentials are part of the key so a changed password gets a fresh pool
+        return (info.host, info.port, info.user, info.password, info.dbname)
+    
+    def _pool(self, info: ConnectionInfo) -> "ConnectionPool":
+        """Get (or create) the connection pool for this server/database."""
+        key = self._key(info)
+        pool = self._pools.get(key)
+        if pool is None:
+            import psycopg
+            from psycopg.rows import dict_row
+            from psycopg_pool import ConnectionPool
+            
+            # Probe once so bad credentials raise the real libpq error
+            # instead of a pool timeout
+            psycopg.connect(**info.kwargs).close()
+            pool = ConnectionPool(
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                timeout=POOL_TIMEOUT,
+                kwargs={**info.kwargs, "autocommit": False, "row_factory": dict_row},
+                open=True
+            )
+            self._pools[key] = pool
+        return pool
     
     def connect(self, info: ConnectionInfo) -> None:
-        """Connect to database."""
-        self.disconnect()
-        self.conn = psycopg.connect(
-            info.connection_string(),
-            autocommit=False,
-            row_factory=dict_row
-        )
+        """Connect to database (checks out a pooled connection)."""
+        pool = self._pool(info)
+        self._release()
+        self._close_other_servers(self._key(info))
+        self.conn = pool.getconn()
+        self._conn_pool = pool
+        self._conn_key = self._key(info)
         self.info = info
+        
+        # Pick catalog query variants once per connection
+        self.server_version = self.conn.info.server_version
+        if self.server_version >= 100000:
+            # Declarative partitioning: list parents, hide individual partitions
+            self._table_filter = "c.relkind IN ('r', 'p') AND NOT c.relispartition"
+        else:
+            self._table_filter = "c.relkind = 'r'"
     
-    def disconnect(self) -> None:
-        """Close connection if open."""
+    def _release(self) -> None:
+        """Return current connection to its pool, discarding any open transaction."""
         if self.conn:
+            import psycopg
+            try:
+                if not self.conn.closed:
+                    self.conn.rollback()
+            except psycopg.Error:
+                pass
             try:
-                self.conn.close()
+                self._conn_pool.putconn(self.conn)
             except Exception:
                 pass
             self.conn = None
             self.info = None
+            self._conn_pool = None
+            self._conn_key = None
+            # Rolled-back DDL may have been cached in the meantime
+            if self._ddl_pending:
+                self._cache.clear()
+                self._ddl_pending = False
+    
+    def _close_other_servers(self, key: tuple[str, int, str, str, str]) -> None:
+        """Close pools for any server/credentials other than this key's."""
+        server = key[:-1]
+        for other in [k for k in self._pools if k[:-1] != server]:
+            try:
+                self._pools.pop(other).close()
+            except Exception:
+                pass
+    
+    def disconnect(self) -> None:
+        """Release current connection and close all pools."""
+        self._release()
+        for pool in self._pools.values():
+            try:
+                pool.close()
+            except Exception:
+                pass
+        self._pools.clear()
     
     def is_connected(self) -> bool:
         return self.conn is not None and not self.conn.closed
@@ -116,23 +361,54 @@ class Database:
         """Commit current transaction."""
         if self.conn:
             self.conn.commit()
+            self._ddl_pending = False
     
     def rollback(self) -> None:
         """Rollback current transaction."""
         if self.conn:
             self.conn.rollback()
+            # Rolled-back DDL may have been cached in the meantime
+            if self._ddl_pending:
+                self._cache.clear()
+                self._ddl_pending = False
+    
+    def invalidate_cache(self) -> None:
+        """Drop all cached introspection results, e.g. on an explicit reconnect."""
+        self._cache.clear()
+    
+    def _cache_get(self, *key) -> Optional[Any]:
+        """Return cached introspection result for this connection, or None if missing/expired."""
+        full_key = (self._conn_key, *key)
+        hit = self._cache.get(full_key)
+        if hit and time.monotonic() - hit[0] < CACHE_TTL:
+            self._cache.move_to_end(full_key)
+            return hit[1]
+        return None
+    
+    def _cache_put(self, value: Any, *key) -> Any:
+        """Store introspection result for this connection and return it."""
+        full_key = (self._conn_key, *key)
+        self._cache[full_key] = (time.monotonic(), value)
+        self._cache.move_to_end(full_key)
+        if len(self._cache) > CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+        return value
     
     def get_databases(self) -> list[str]:
         """Get list of databases on the server."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
+        cached = self._cache_get("databases")
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
             cur.execute("""
                 SELECT datname FROM pg_database
                 WHERE datistemplate = false
                 ORDER BY datname
             """)
-            return [row["datname"] for row in cur.fetchall()]
+            return self._cache_put(cur.fetchall(), "databases")
     
     def switch_database(self, dbname: str) -> None:
         """Switch to a different database on the same server."""
@@ -152,70 +428,105 @@ class Database:
         """Get list of schemas."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
+        cached = self._cache_get("schemas")
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
             cur.execute("""
-                SELECT schema_name FROM information_schema.schemata
-                WHERE schema_name NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                ORDER BY schema_name
+                SELECT nspname FROM pg_namespace
+                WHERE nspname !~ '^pg_' AND nspname <> 'information_schema'
+                ORDER BY nspname
             """)
-            return [row["schema_name"] for row in cur.fetchall()]
+            return self._cache_put(cur.fetchall(), "schemas")
     
     def get_tables(self, schema: str) -> list[str]:
         """Get list of tables in schema."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                SELECT table_name FROM information_schema.tables
-                WHERE table_schema = %s AND table_type = 'BASE TABLE'
-                ORDER BY table_name
-            """, (schema,))
-            return [row["table_name"] for row in cur.fetchall()]
+        cached = self._cache_get("tables", schema)
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
+            cur.execute(f"""
+                SELECT c.relname
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND {self._table_filter}
+                ORDER BY c.relname
+            """, (schema,), prepare=True)
+            return self._cache_put(cur.fetchall(), "tables", schema)
     
     def get_all_tables(self) -> list[tuple[str, str]]:
         """Get all tables in current database as (schema, table) pairs."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                SELECT table_schema, table_name 
-                FROM information_schema.tables
-                WHERE table_schema NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                  AND table_type = 'BASE TABLE'
-                ORDER BY table_schema, table_name
+        cached = self._cache_get("all_tables")
+        if cached is not None:
+            return cached
+        from psycopg.rows import tuple_row
+        with self.conn.cursor(row_factory=tuple_row) as cur:
+            cur.execute(f"""
+                SELECT n.nspname, c.relname
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname !~ '^pg_' AND n.nspname <> 'information_schema'
+                  AND {self._table_filter}
+                ORDER BY n.nspname, c.relname
             """)
-            return [(row["table_schema"], row["table_name"]) for row in cur.fetchall()]
+            return self._cache_put(cur.fetchall(), "all_tables")
     
     def get_columns(self, schema: str, table: str) -> list[str]:
         """Get column names for a table."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
+        cached = self._cache_get("columns", schema, table)
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
             cur.execute("""
-                SELECT column_name FROM information_schema.columns
-                WHERE table_schema = %s AND table_name = %s
-                ORDER BY ordinal_position
-            """, (schema, table))
-            return [row["column_name"] for row in cur.fetchall()]
+                SELECT a.attname
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = %s
+                  AND a.attnum > 0 AND NOT a.attisdropped
+                ORDER BY a.attnum
+            """, (schema, table), prepare=True)
+            return self._cache_put(cur.fetchall(), "columns", schema, table)
     
     def get_all_columns(self) -> list[str]:
         """Get all unique column names in current database."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
+        cached = self._cache_get("all_columns")
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
             cur.execute("""
-                SELECT DISTINCT column_name 
-                FROM information_schema.columns
-                WHERE table_schema NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                ORDER BY column_name
+                SELECT DISTINCT a.attname
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE a.attnum > 0 AND NOT a.attisdropped
+                  AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                  AND n.nspname !~ '^pg_' AND n.nspname <> 'information_schema'
+                ORDER BY a.attname
             """)
-            return [row["column_name"] for row in cur.fetchall()]
+            return self._cache_put(cur.fetchall(), "all_columns")
 
     def get_primary_keys(self, schema: str, table: str) -> list[str]:
         """Get primary key columns for a table."""
         if not self.conn:
             return []
-        with self.conn.cursor() as cur:
+        cached = self._cache_get("primary_keys", schema, table)
+        if cached is not None:
+            return cached
+        from psycopg.rows import scalar_row
+        with self.conn.cursor(row_factory=scalar_row) as cur:
             cur.execute("""
                 SELECT a.attname
                 FROM pg_index i
@@ -224,31 +535,98 @@ class Database:
                 JOIN pg_namespace n ON n.oid = c.relnamespace
                 WHERE i.indisprimary AND c.relname = %s AND n.nspname = %s
                 ORDER BY array_position(i.indkey, a.attnum)
-            """, (table, schema))
-            return [row["attname"] for row in cur.fetchall()]
+            """, (table, schema), prepare=True)
+            return self._cache_put(cur.fetchall(), "primary_keys", schema, table)
+    
+    def get_approx_rowcount(self, schema: str, table: str) -> Optional[int]:
+        """Get planner row estimate for a table (no scan), or None if unknown."""
+        if not self.conn:
+            return None
+        estimate = self._cache_get("approx_rowcount", schema, table)
+        if estimate is None:
+            from psycopg.rows import scalar_row
+            with self.conn.cursor(row_factory=scalar_row) as cur:
+                cur.execute("""
+                    SELECT c.reltuples::bigint
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = %s AND c.relname = %s
+                """, (schema, table), prepare=True)
+                row = cur.fetchone()
+            estimate = self._cache_put(row if row is not None else -1, "approx_rowcount", schema, table)
+        # reltuples is -1 until the table has been vacuumed/analyzed
+        return estimate if estimate >= 0 else None
+    
+    def get_catalog_snapshot(self) -> dict[str, dict[str, list[str]]]:
+        """
+        Get schemas, their tables and table columns in one round-trip.
+        Returns {schema: {table: [columns]}}. Also fills the per-call caches
+        used by get_schemas/get_tables/get_columns.
+        """
+        if not self.conn:
+            return {}
+        cached = self._cache_get("catalog")
+        if cached is not None:
+            return cached
+        from psycopg.rows import tuple_row
+        with self.conn.cursor(row_factory=tuple_row) as cur:
+            cur.execute(f"""
+                SELECT n.nspname, c.relname, a.attname
+                FROM pg_namespace n
+                LEFT JOIN pg_class c ON c.relnamespace = n.oid AND {self._table_filter}
+                LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+                WHERE n.nspname !~ '^pg_' AND n.nspname <> 'information_schema'
+                ORDER BY n.nspname, c.relname, a.attnum
+            """)
+            catalog: dict[str, dict[str, list[str]]] = {}
+            for schema, table, column in cur:
+                tables = catalog.setdefault(schema, {})
+                if table is not None:
+                    columns = tables.setdefault(table, [])
+                    if column is not None:
+                        columns.append(column)
+        
+        self._cache_put(list(catalog), "schemas")
+        for schema, tables in catalog.items():
+            self._cache_put(list(tables), "tables", schema)
+            for table, columns in tables.items():
+                self._cache_put(columns, "columns", schema, table)
+        return self._cache_put(catalog, "catalog")
     
-    def execute_query(self, query: str) -> tuple[list[dict], list[str], list[int], Optional[str], int]:
+    def execute_query(self, query: str, on_batch: Optional[Callable[[list[dict], list[str], list[int]], None]] = None,
+                      max_rows: Optional[int] = None) -> tuple[list[dict], list[str], list[int], Optional[str], int]:
         """
         Execute SQL query.
         Returns (rows, columns, column_types, error_message, rowcount).
         Auto-appends LIMIT 1000 to SELECT queries without LIMIT.
+        SELECT rows are fetched FETCH_BATCH at a time; if on_batch is given,
+        each batch is passed to it as (rows, columns, column_types) instead
+        of being collected. Stops after max_rows rows if set.
         """
         if not self.conn:
             return [], [], [], "Not connected", 0
         
-        # Auto-append LIMIT 1000 for SELECT without LIMIT
-        query_stripped = query.strip().rstrip(";")
-        query_upper = query_stripped.upper()
+        import psycopg
         
-        is_select = query_upper.startswith("SELECT")
+        # Auto-append LIMIT 1000 for SELECT without LIMIT (comments stripped
+        # first so a trailing "-- ..." can't swallow the appended LIMIT)
+        query_stripped, statement = _strip_query(query)
         
-        if is_select and "LIMIT" not in query_upper:
-            query_stripped += " LIMIT 1000"
+        is_select = _is_select(query_stripped, statement)
+        if is_select:
+            if statement is None:
+                # Too large for sqlparse: cap the rows fetched rather than
+                # guess where a LIMIT could go
+                if max_rows is None:
+                    max_rows = 1000
+            elif not _has_limit(statement):
+                query_stripped += " LIMIT 1000"
         
         try:
             if is_select:
                 # Use server-side cursor for large SELECT results
                 with self.conn.cursor(name="pgcustom_cursor") as cur:
+                    cur.itersize = FETCH_BATCH
                     cur.execute(query_stripped)
                     if cur.description:
                         columns = [desc.name for desc in cur.description]
@@ -257,19 +635,65 @@ class Database:
                     else:
                         columns = []
                         column_types = []
-                    rows = cur.fetchall()
-                    return rows, columns, column_types, None, len(rows)
+                    rows = []
+                    rowcount = 0
+                    while batch := cur.fetchmany(cur.itersize):
+                        if max_rows is not None and rowcount + len(batch) > max_rows:
+                            batch = batch[:max_rows - rowcount]
+                        rowcount += len(batch)
+                        if on_batch:
+                            on_batch(batch, columns, column_types)
+                        else:
+                            rows.extend(batch)
+                        if max_rows is not None and rowcount >= max_rows:
+                            break
+                    return rows, columns, column_types, None, rowcount
             else:
                 # Use regular cursor for DML (UPDATE/INSERT/DELETE)
                 with self.conn.cursor() as cur:
                     cur.execute(query_stripped)
                     rowcount = cur.rowcount
-                    return [], [], [], None, rowcount
+                if _DDL_RE.search(query_stripped):
+                    # Schema changed - drop cached catalog lookups
+                    self._cache.clear()
+                    self._ddl_pending = True
+                return [], [], [], None, rowcount
                     
         except psycopg.Error as e:
             self.conn.rollback()
             return [], [], [], str(e), 0
     
+    def _update_query(self, schema: str, table: str, pk_columns: list[str],
+                      columns: tuple[str, ...]) -> "sql.Composed":
+        """Build (or reuse) UPDATE statement setting one row's columns, keyed by primary key."""
+        key = (schema, table, tuple(pk_columns), columns)
+        query = self._update_sql_cache.get(key)
+        if query is not None:
+            return query
+        
+        from psycopg import sql
+        
+        # Build WHERE clause from primary keys
+        where_parts = [
+            sql.SQL("{} = {}").format(sql.Identifier(pk), sql.Placeholder())
+            for pk in pk_columns
+        ]
+        where_clause = sql.SQL(" AND ").join(where_parts)
+        
+        set_clause = sql.SQL(", ").join(
+            sql.SQL("{} = {}").format(sql.Identifier(col), sql.Placeholder())
+            for col in columns
+        )
+        
+        query = sql.SQL("UPDATE {}.{} SET {} WHERE {}").format(
+            sql.Identifier(schema),
+            sql.Identifier(table),
+            set_clause,
+            where_clause
+        )
+        self._update_sql_cache[key] = query
+        return query
+    
     def execute_update(self, schema: str, table: str, pk_columns: list[str],
                        pk_values: list[Any], column: str, new_value: Any) -> Optional[str]:
         """
@@ -282,28 +706,59 @@ class Database:
         if not pk_columns:
             return "No primary key - cannot update"
         
+        import psycopg
+        
         try:
-            # Build WHERE clause from primary keys
-            where_parts = [
-                sql.SQL("{} = {}").format(sql.Identifier(pk), sql.Placeholder())
-                for pk in pk_columns
-            ]
-            where_clause = sql.SQL(" AND ").join(where_parts)
+            query = self._update_query(schema, table, pk_columns, (column,))
             
-            query = sql.SQL("UPDATE {}.{} SET {} = {} WHERE {}").format(
-                sql.Identifier(schema),
-                sql.Identifier(table),
-                sql.Identifier(column),
-                sql.Placeholder(),
-                where_clause
-            )
-            
-            with self.conn.cursor() as cur:
+            # Savepoint: a failed edit doesn't abort the surrounding transaction
+            with self.conn.transaction(), self.conn.cursor() as cur:
                 cur.execute(query, [new_value] + pk_values)
             
             return None
             
         except psycopg.Error as e:
-            self.conn.rollback()
             return str(e)
-
+    
+    def execute_updates(self, edits: list[tuple[str, str, list[str], list[Any], str, Any]]) -> list[str]:
+        """
+        Execute many cell edits in one pipelined round-trip.
+        Each edit is (schema, table, pk_columns, pk_values, column, new_value);
+        edits to the same row are merged into one multi-column UPDATE.
+        Returns list of error messages (empty on success). All edits are
+        applied or none are.
+        """
+        if not self.conn:
+            return ["Not connected"]
+        
+        if any(not pk_columns for _, _, pk_columns, _, _, _ in edits):
+            return ["No primary key - cannot update"]
+        
+        import psycopg
+        
+        # Group cells by row so each row gets one UPDATE with all its columns
+        rows: dict[tuple, tuple[str, str, list[str], list[Any], dict[str, Any]]] = {}
+        for schema, table, pk_columns, pk_values, column, new_value in edits:
+            row_key = (schema, table, tuple(pk_columns), tuple(pk_values))
+            try:
+                hash(row_key)
+            except TypeError:
+                # Unhashable key value (e.g. array PK): group by the value list object
+                row_key = (schema, table, tuple(pk_columns), id(pk_values))
+            row = rows.get(row_key)
+            if row is None:
+                row = rows[row_key] = (schema, table, pk_columns, pk_values, {})
+            row[4][column] = new_value
+        
+        # Pipeline mode needs libpq 14+; fall back to one round-trip per edit
+        pipeline = self.conn.pipeline() if psycopg.Pipeline.is_supported() else nullcontext()
+        
+        try:
+            with pipeline, self.conn.transaction(), self.conn.cursor() as cur:
+                for schema, table, pk_columns, pk_values, values in rows.values():
+                    query = self._update_query(schema, table, pk_columns, tuple(values))
+                    cur.execute(query, [*values.values(), *pk_values])
+            return []
+            
+        except psycopg.Error as e:
+            return [str(e)]
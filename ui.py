@@ -1,40 +1,141 @@
 """PgKKSql UI Components"""
 
+import re
+import sys
+from array import array
+from collections import OrderedDict
+from dataclasses import replace
 from typing import Optional, Any
+import sqlparse
+from sqlparse.exceptions import SQLParseError
+from sqlparse.sql import Identifier, Parenthesis
+from sqlparse.tokens import Comment, Keyword
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QTreeWidget, QTreeWidgetItem, QPlainTextEdit, QTableView,
     QPushButton, QDialog, QFormLayout, QLineEdit, QSpinBox,
     QComboBox, QStatusBar, QToolBar, QMessageBox, QHeaderView,
     QStyledItemDelegate, QCheckBox, QDoubleSpinBox, QCompleter,
-    QListView, QStackedWidget, QTextEdit
+    QListView, QStackedWidget, QMenu
 )
-from PySide6.QtCore import Qt, QThread, Signal, QAbstractTableModel, QModelIndex, QStringListModel, QRect
-from PySide6.QtGui import QFont, QAction, QKeySequence, QTextCursor
+from PySide6.QtCore import Qt, QThread, QThreadPool, QRunnable, QObject, Signal, QAbstractTableModel, QModelIndex, QStringListModel, QRect, QTimer
+from PySide6.QtGui import QFont, QAction, QKeySequence, QTextCursor, QColor
+
+from db import (
+    Database, ConnectionInfo, load_connections, save_connections, get_last_connection,
+    update_connection_timestamp, is_select_query,
+)
+
+
+# Identifier (optionally schema-qualified) ending at / starting at the cursor
+_IDENT_TAIL_RE = re.compile(r"[^\W\d][\w.]*$")
+_IDENT_HEAD_RE = re.compile(r"[\w.]*")
+
+# Top-level keywords that make a SELECT's rows unattributable to a single table
+_NON_EDITABLE_KEYWORDS = frozenset(("WITH", "UNION", "UNION ALL", "INTERSECT", "EXCEPT"))
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _has_join(query: str) -> bool:
+    """True if JOIN appears as a whole word (literal str.find scan, no regex)."""
+    text = query.lower()
+    end = len(text)
+    i = text.find("join")
+    while i != -1:
+        if (i == 0 or not _is_word_char(text[i - 1])) and (i + 4 == end or not _is_word_char(text[i + 4])):
+            return True
+        i = text.find("join", i + 4)
+    return False
+
+
+# query text -> (schema, table), most recent last
+_PARSE_CACHE: OrderedDict[str, tuple[str, str]] = OrderedDict()
+
+
+def _parse_table_from_query(query: str) -> tuple[str, str]:
+    """
+    Try to extract schema and table from a simple SELECT query.
+    Returns (schema, table) or ("", "") if unable to parse.
+    Results are memoized per query text, since the same query is often re-run.
+    Called from the query worker thread only.
+    """
+    hit = _PARSE_CACHE.get(query)
+    if hit is not None:
+        _PARSE_CACHE.move_to_end(query)
+        return hit
+    result = _scan_table_from_query(query)
+    _PARSE_CACHE[query] = result
+    if len(_PARSE_CACHE) > 128:
+        _PARSE_CACHE.popitem(last=False)
+    return result
+
+
+def _scan_table_from_query(query: str) -> tuple[str, str]:
+    """Find the FROM table; only works for single-table SELECTs without JOINs."""
+    # Skip if it has JOINs - too complex for editing
+    if _has_join(query):
+        return "", ""
+
+    try:
+        statement = next(sqlparse.parsestream(query), None)
+    except SQLParseError:
+        # Over sqlparse's token limit (e.g. a huge IN list) - just not editable
+        return "", ""
+    if statement is None or statement.get_type() != "SELECT":
+        return "", ""
+
+    found = None
+    seen_from = False
+    for token in statement.tokens:
+        if token.is_whitespace or token.ttype in Comment:
+            continue
+        if token.ttype in Keyword and token.normalized in _NON_EDITABLE_KEYWORDS:
+            # CTEs and set operations don't map rows to one table
+            return "", ""
+        if not seen_from:
+            seen_from = token.ttype is Keyword and token.normalized == "FROM"
+        elif found is None:
+            # Exactly one plain table reference, not a list or subquery
+            if not isinstance(token, Identifier) or any(isinstance(t, Parenthesis) for t in token.tokens):
+                return "", ""
+            found = token
+
+    if found is None:
+        return "", ""
+    # Unqualified table - assume public schema
+    return found.get_parent_name() or "public", found.get_real_name()
+
+
+# "0 rows", "1 row", "2 rows", ... for every count a limited result can have
+_ROW_STR = tuple(f"{i} row" if i == 1 else f"{i} rows" for i in range(1001))
 
-from db import Database, ConnectionInfo, load_connections, save_connections, get_last_connection, update_connection_timestamp
+
+def _rows_text(n: int) -> str:
+    """Pluralized row count, looked up for common counts."""
+    return _ROW_STR[n] if 0 <= n < len(_ROW_STR) else f"{n} rows"
 
 
 class SqlEditor(QPlainTextEdit):
     """SQL editor with autocomplete support."""
     
+    _KEYWORDS = (
+        "SELECT", "FROM", "WHERE", "AND", "OR", "NOT", "IN", "LIKE", "ILIKE",
+        "ORDER BY", "GROUP BY", "HAVING", "LIMIT", "OFFSET", "JOIN", "LEFT JOIN",
+        "RIGHT JOIN", "INNER JOIN", "OUTER JOIN", "ON", "AS", "DISTINCT",
+        "INSERT INTO", "VALUES", "UPDATE", "SET", "DELETE FROM", "CREATE TABLE",
+        "ALTER TABLE", "DROP TABLE", "NULL", "IS NULL", "IS NOT NULL",
+        "ASC", "DESC", "COUNT", "SUM", "AVG", "MIN", "MAX", "BETWEEN", "CASE",
+        "WHEN", "THEN", "ELSE", "END", "COALESCE", "CAST", "TRUE", "FALSE"
+    )
+    # Keywords never change, so lowercase them once
+    _KEYWORDS_LC = {kw.lower(): kw for kw in _KEYWORDS}
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        # Completion data
-        self._tables: list[str] = []  # Full table names: schema.table
-        self._table_names: list[str] = []  # Just table names
-        self._columns: list[str] = []
-        self._keywords = [
-            "SELECT", "FROM", "WHERE", "AND", "OR", "NOT", "IN", "LIKE", "ILIKE",
-            "ORDER BY", "GROUP BY", "HAVING", "LIMIT", "OFFSET", "JOIN", "LEFT JOIN",
-            "RIGHT JOIN", "INNER JOIN", "OUTER JOIN", "ON", "AS", "DISTINCT",
-            "INSERT INTO", "VALUES", "UPDATE", "SET", "DELETE FROM", "CREATE TABLE",
-            "ALTER TABLE", "DROP TABLE", "NULL", "IS NULL", "IS NOT NULL",
-            "ASC", "DESC", "COUNT", "SUM", "AVG", "MIN", "MAX", "BETWEEN", "CASE",
-            "WHEN", "THEN", "ELSE", "END", "COALESCE", "CAST", "TRUE", "FALSE"
-        ]
-        
         # Setup completer
         self._completer = QCompleter(self)
         self._completer.setWidget(self)
@@ -46,6 +147,13 @@ class SqlEditor(QPlainTextEdit):
         # Model for completions
         self._model = QStringListModel()
         self._completer.setModel(self._model)
+        self._model.setStringList(list(self._KEYWORDS))
+        
+        # Debounce: refresh completions once typing pauses, not per keystroke
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(60)
+        self._update_timer.timeout.connect(self._update_completions)
         
         # Style the popup
         popup = self._completer.popup()
@@ -62,30 +170,72 @@ class SqlEditor(QPlainTextEdit):
             }
         """)
     
+    @classmethod
+    def build_completion_list(cls, tables: list[tuple[str, str]], columns: list[str]) -> list[str]:
+        """
+        Build the candidate list: keywords, table names, schema.table, then
+        columns; first spelling wins for names differing only in case.
+        Pure Python, so workers can run it off the GUI thread.
+        """
+        by_lower = dict(cls._KEYWORDS_LC)
+        for schema, table in tables:
+            by_lower.setdefault(table.lower(), table)
+        for schema, table in tables:
+            qualified = f"{schema}.{table}"
+            by_lower.setdefault(qualified.lower(), qualified)
+        for col in columns:
+            by_lower.setdefault(col.lower(), col)
+        return list(by_lower.values())
+    
     def set_completions(self, tables: list[tuple[str, str]], columns: list[str]):
         """Update completion data from database."""
-        self._tables = [f"{schema}.{table}" for schema, table in tables]
-        self._table_names = [table for _, table in tables]
-        self._columns = columns
+        self.set_completion_list(self.build_completion_list(tables, columns))
+    
+    def set_completion_list(self, words: list[str]):
+        """Load prebuilt candidates; QCompleter filters them natively per keystroke."""
+        self._model.setStringList(words)
+    
+    def _word_span(self, qualified: bool = True) -> tuple[int, int]:
+        """
+        Document positions of the identifier at the cursor, schema.table included.
+        With qualified=False only the dot-separated part at the cursor is covered.
+        """
+        cursor = self.textCursor()
+        # Identifiers never span lines, so only the current block is scanned
+        text = cursor.block().text()
+        offset = cursor.positionInBlock()
+        block_start = cursor.position() - offset
+        before = _IDENT_TAIL_RE.search(text, 0, offset)
+        start = before.start() if before else offset
+        end = _IDENT_HEAD_RE.match(text, offset).end()
+        if not qualified:
+            # Keep the "alias." / "table." qualifier in front of a column
+            start = max(start, text.rfind(".", start, offset) + 1)
+            dot = text.find(".", offset, end)
+            if dot != -1:
+                end = dot
+        return block_start + start, block_start + end
     
     def _get_word_under_cursor(self) -> str:
-        """Get the current word being typed."""
+        """Get the current word being typed (up to the cursor)."""
         cursor = self.textCursor()
-        cursor.select(QTextCursor.WordUnderCursor)
-        return cursor.selectedText()
+        text = cursor.block().text()
+        match = _IDENT_TAIL_RE.search(text, 0, cursor.positionInBlock())
+        return match.group() if match else ""
     
     def _get_word_start_position(self) -> int:
         """Get position where current word starts."""
-        cursor = self.textCursor()
-        cursor.select(QTextCursor.WordUnderCursor)
-        return cursor.selectionStart()
+        return self._word_span()[0]
     
     def _insert_completion(self, completion: str):
         """Insert the selected completion."""
+        self._update_timer.stop()  # Don't reopen the popup for the completed word
         cursor = self.textCursor()
         
-        # Select and replace the current word
-        cursor.select(QTextCursor.WordUnderCursor)
+        # Select and replace the current word; a bare name keeps its qualifier
+        start, end = self._word_span(qualified="." in completion)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
         cursor.removeSelectedText()
         cursor.insertText(completion)
         
@@ -99,45 +249,15 @@ class SqlEditor(QPlainTextEdit):
             self._completer.popup().hide()
             return
         
-        # Build completion list
-        completions = []
-        word_upper = word.upper()
-        word_lower = word.lower()
-        
-        # Add matching keywords
-        for kw in self._keywords:
-            if word_upper in kw:
-                completions.append(kw)
-        
-        # Add matching table names
-        for table in self._table_names:
-            if word_lower in table.lower():
-                completions.append(table)
-        
-        # Add matching full table names (schema.table)
-        for table in self._tables:
-            if word_lower in table.lower():
-                completions.append(table)
-        
-        # Add matching column names
-        for col in self._columns:
-            if word_lower in col.lower():
-                completions.append(col)
-        
-        if not completions:
+        self._completer.setCompletionPrefix(word)
+        if self._completer.completionCount() == 0 and "." in word:
+            # Not a schema.table candidate: complete the name after the qualifier
+            word = word.rpartition(".")[2]
+            self._completer.setCompletionPrefix(word)
+        if not word or self._completer.completionCount() == 0:
             self._completer.popup().hide()
             return
         
-        # Remove duplicates, keep order
-        seen = set()
-        unique = []
-        for c in completions:
-            if c.lower() not in seen:
-                seen.add(c.lower())
-                unique.append(c)
-        
-        self._model.setStringList(unique[:20])  # Limit to 20 suggestions
-        
         # Position popup
         cursor_rect = self.cursorRect()
         cursor_rect.setWidth(300)
@@ -155,6 +275,7 @@ class SqlEditor(QPlainTextEdit):
                 self._completer.popup().hide()
                 return
             elif event.key() == Qt.Key_Escape:
+                self._update_timer.stop()
                 self._completer.popup().hide()
                 return
             elif event.key() in (Qt.Key_Return, Qt.Key_Enter):
@@ -173,9 +294,9 @@ class SqlEditor(QPlainTextEdit):
         
         # Update completions after typing
         if event.text() and event.text().isprintable():
-            self._update_completions()
+            self._update_timer.start()
         elif event.key() == Qt.Key_Backspace:
-            self._update_completions()
+            self._update_timer.start()
 
 
 # PostgreSQL type OIDs for common types
@@ -193,19 +314,133 @@ PG_DATE = 1082
 PG_TIMESTAMP = 1114
 PG_TIMESTAMPTZ = 1184
 
+# Only this many leading result columns are measured for auto-width
+RESIZE_MAX_COLUMNS = 50
+
+# Tree item flag: a database node's schemas/tables have been loaded
+LOADED_ROLE = Qt.UserRole + 1
 
-class QueryWorker(QThread):
-    """Worker thread for async query execution."""
-    finished = Signal(list, list, list, str, int)  # rows, columns, types, error, rowcount
+# Compact column storage for fixed-width types (NUMERIC stays Decimal objects)
+_ARRAY_TYPECODES = {PG_INT2: "q", PG_INT4: "q", PG_INT8: "q", PG_FLOAT4: "d", PG_FLOAT8: "d"}
+_TEXT_TYPES = frozenset((PG_TEXT, PG_VARCHAR, PG_CHAR))
+
+
+class QueryWorkerSignals(QObject):
+    """Signals for QueryWorker (a QRunnable can't declare its own)."""
+    batch = Signal(list, list, list)  # column values, columns, types - SELECT rows as they arrive
+    # rows, columns, types, error, rowcount, schema, table, has_join
+    finished = Signal(list, list, list, str, int, str, str, bool)
+
+
+class QueryWorker(QRunnable):
+    """Pooled task for async query execution."""
     
-    def __init__(self, db: Database, query: str):
+    BATCH_ROWS = 500  # Rows per batch signal
+    
+    def __init__(self, db: Database, query: str, schema: str = "", table: str = "",
+                 parse_table: bool = False):
         super().__init__()
+        self.setAutoDelete(False)  # MainWindow keeps the reference
+        self.signals = QueryWorkerSignals()
         self.db = db
         self.query = query
+        self.schema = schema  # Known target table (tree double-click), else detected
+        self.table = table
+        self.parse_table = parse_table
+    
+    def run(self):
+        try:
+            self._execute()
+        except Exception as e:
+            # Always report back, or the window would consider the query still running
+            self.signals.finished.emit([], [], [], str(e), 0, "", "", False)
+    
+    def _execute(self):
+        schema, table = self.schema, self.table
+        if not table and self.parse_table:
+            schema, table = _parse_table_from_query(self.query)
+        has_join = _has_join(self.query)
+        
+        pending = []
+        
+        def emit_batch(columns: list, types: list):
+            # Transpose here so the GUI thread only has to extend column lists
+            self.signals.batch.emit([[r.get(name) for r in pending] for name in columns], columns, types)
+        
+        def on_batch(rows: list, columns: list, types: list):
+            nonlocal pending
+            pending.extend(rows)
+            if len(pending) >= self.BATCH_ROWS:
+                emit_batch(columns, types)
+                pending = []
+        
+        # SELECT rows are streamed through `batch`; `finished` then carries no rows
+        rows, columns, types, error, rowcount = self.db.execute_query(self.query, on_batch=on_batch)
+        if pending and not error:
+            emit_batch(columns, types)
+        self.signals.finished.emit(rows, columns, types, error or "", rowcount, schema, table, has_join)
+
+
+class ConnectWorker(QThread):
+    """Worker thread for connecting and loading server/completion metadata."""
+    finished = Signal(list, list, str)  # databases, completion words, error
+    
+    def __init__(self, db: Database, info: ConnectionInfo):
+        super().__init__()
+        self.db = db
+        self.info = info
+        self.timestamp: Optional[str] = None
     
     def run(self):
-        rows, columns, types, error, rowcount = self.db.execute_query(self.query)
-        self.finished.emit(rows, columns, types, error or "", rowcount)
+        try:
+            self.db.connect(self.info)
+            # Remember for next startup
+            self.timestamp = update_connection_timestamp(self.info.name)
+            databases = self.db.get_databases()
+            # Lowercasing/dedup for completions happens here, not on the GUI thread
+            words = SqlEditor.build_completion_list(self.db.get_all_tables(), self.db.get_all_columns())
+        except Exception as e:
+            self.finished.emit([], [], str(e))
+            return
+        self.finished.emit(databases, words, "")
+
+
+class MetadataWorker(QThread):
+    """Worker thread for loading one database's schema/table catalog."""
+    finished = Signal(str, dict, str)  # dbname, {schema: {table: [columns]}}, error
+    
+    def __init__(self, db: Database, info: ConnectionInfo):
+        super().__init__()
+        self.db = db
+        self.info = info
+    
+    def run(self):
+        try:
+            if not self.db.is_connected():
+                self.db.connect(self.info)
+            catalog = self.db.get_catalog_snapshot()
+            self.db.rollback()  # Don't sit idle in transaction between expands
+        except Exception as e:
+            self.finished.emit(self.info.dbname, {}, str(e))
+            return
+        self.finished.emit(self.info.dbname, catalog, "")
+
+
+class SaveConnectionsWorker(QThread):
+    """Worker thread for writing the saved-connections file."""
+    finished = Signal(str)  # error
+    
+    def __init__(self, connections: list[ConnectionInfo]):
+        super().__init__()
+        self.connections = list(connections)  # Snapshot; the UI keeps editing its list
+    
+    def run(self):
+        try:
+            save_connections(self.connections)
+        except OSError as e:
+            self.finished.emit(str(e))
+            return
+        self.finished.emit("")
 
 
 class ResultsModel(QAbstractTableModel):
@@ -213,44 +448,154 @@ class ResultsModel(QAbstractTableModel):
     
     editsChanged = Signal(int)  # Signal emitted when edit count changes
     
+    # Shared cell styling, built once instead of per data() call
+    _EDIT_BG = QColor(255, 200, 150)  # Soft orange - clearly visible
+    _ERR_BG = QColor(255, 230, 230)  # Light red
+    _ERR_FG = QColor(180, 0, 0)  # Dark red text
+    _CENTER = Qt.AlignCenter
+    _ROLES = frozenset((
+        Qt.DisplayRole, Qt.EditRole, Qt.BackgroundRole,
+        Qt.ForegroundRole, Qt.TextAlignmentRole,
+    ))
+    
     def __init__(self):
         super().__init__()
-        self._data: list[dict] = []
+        self._columns_data: list[list] = []  # One list of values per column
+        self._row_count: int = 0
+        self._loaded_rows: int = 0  # Rows exposed to the view so far
+        self._fetch_batch: int = 200
         self._columns: list[str] = []
         self._column_types: list[int] = []  # PostgreSQL type OIDs
-        self._edits: dict[tuple[int, int], Any] = {}  # (row, col) -> new_value
+        self._edits: dict[int, dict[int, Any]] = {}  # row -> {col: new_value}
+        self._edit_count: int = 0
+        self._bulk_rect: Optional[tuple[int, int, int, int]] = None  # top, left, bottom, right
+        self._bulk_count: int = 0  # Edit count when the bulk edit began
         self._pk_columns: list[str] = []
+        self._pk_indices: list[Optional[int]] = []  # Column index per PK, None if not selected
         self._schema: str = ""
         self._table: str = ""
         self._is_error: bool = False
+        self._order: Optional[list[int]] = None  # View row -> stored row while sorted
+        self._sort_cache: dict[int, list[int]] = {}  # Column -> ascending permutation
     
     def set_data(self, rows: list[dict], columns: list[str], column_types: list[int] = None):
+        self.begin_stream(columns, column_types)
+        self.append_rows(rows)
+        self.finish_stream()
+    
+    def begin_stream(self, columns: list[str], column_types: list[int] = None):
+        """Reset to an empty result with these columns; rows follow via append_columns."""
         self.beginResetModel()
-        self._data = rows
-        self._columns = columns
+        # Store column-wise so cell lookups are plain list indexing
+        self._columns_data = [[] for _ in columns]
+        self._row_count = 0
+        self._loaded_rows = 0
+        self._columns = [sys.intern(c) for c in columns]
         self._column_types = column_types or []
         self._edits.clear()
+        self._edit_count = 0
+        self._order = None
+        self._sort_cache.clear()
+        self._schema = ""
+        self._table = ""
+        self._pk_columns = []
+        self._pk_indices = []
         self._is_error = len(columns) == 1 and columns[0] == "Error"
         self.endResetModel()
         self.editsChanged.emit(0)
     
+    def append_rows(self, rows: list[dict]):
+        """Add a batch of rows to the current result."""
+        self.append_columns([[r.get(name) for r in rows] for name in self._columns])
+    
+    def append_columns(self, columns_data: list[list]):
+        """Add a batch of rows given column-wise, one equal-length list per column."""
+        count = len(columns_data[0]) if columns_data else 0
+        if not count:
+            return
+        start = self._row_count
+        for values, batch in zip(self._columns_data, columns_data):
+            values.extend(batch)
+        self._row_count += count
+        self._sort_cache.clear()
+        if self._order is not None:
+            self._order = self._order + list(range(start, self._row_count))
+        
+        # Fill the first page right away; later rows are paged in by fetchMore
+        visible = min(self._fetch_batch, self._row_count)
+        if visible > self._loaded_rows:
+            self.beginInsertRows(QModelIndex(), self._loaded_rows, visible - 1)
+            self._loaded_rows = visible
+            self.endInsertRows()
+    
+    def finish_stream(self):
+        """All rows are in: compact numeric columns and share repeated strings."""
+        types = self._column_types
+        self._columns_data = [
+            self._pack_column(values, types[i] if i < len(types) else 0)
+            for i, values in enumerate(self._columns_data)
+        ]
+    
+    @staticmethod
+    def _share_strings(values: list) -> list:
+        """Point equal strings at one object when a column has few distinct values."""
+        pool: dict[str, str] = {}
+        shared = [pool.setdefault(v, v) if type(v) is str else v for v in values]
+        # Only worth keeping for low-cardinality columns (status codes, countries, ...)
+        return shared if len(pool) <= len(values) // 10 else values
+    
+    @staticmethod
+    def _pack_column(values: list, type_oid: int):
+        """Store NULL-free integer/float columns as 8-byte typed arrays instead of object lists."""
+        typecode = _ARRAY_TYPECODES.get(type_oid)
+        if typecode is None:
+            return ResultsModel._share_strings(values) if type_oid in _TEXT_TYPES else values
+        if None in values:
+            return values
+        try:
+            return array(typecode, values)
+        except (OverflowError, TypeError):
+            return values
+    
     def set_table_info(self, schema: str, table: str, pk_columns: list[str]):
         self._schema = schema
         self._table = table
         self._pk_columns = pk_columns
+        # Resolve PK names to column indices once, not per pending edit
+        positions = {name: i for i, name in reversed(list(enumerate(self._columns)))}
+        self._pk_indices = [positions.get(pk) for pk in pk_columns]
     
     def clear(self):
         self.beginResetModel()
-        self._data = []
+        self._columns_data = []
+        self._row_count = 0
+        self._loaded_rows = 0
         self._columns = []
         self._column_types = []
         self._edits.clear()
+        self._edit_count = 0
+        self._order = None
+        self._sort_cache.clear()
         self._is_error = False
         self.endResetModel()
         self.editsChanged.emit(0)
     
     def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
+        return self._loaded_rows
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded_rows < self._row_count
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """Expose the next batch of buffered rows as the view scrolls."""
+        if parent.isValid():
+            return
+        count = min(self._fetch_batch, self._row_count - self._loaded_rows)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + count - 1)
+        self._loaded_rows += count
+        self.endInsertRows()
     
     def columnCount(self, parent=QModelIndex()):
         return len(self._columns)
@@ -268,17 +613,21 @@ class ResultsModel(QAbstractTableModel):
         return 0
     
     def data(self, index: QModelIndex, role=Qt.DisplayRole):
-        if not index.isValid():
+        if role not in self._ROLES or not index.isValid():
             return None
         
         row, col = index.row(), index.column()
+        if self._order is not None and 0 <= row < self._row_count:
+            row = self._order[row]
+        row_edits = self._edits.get(row)
+        edited = row_edits is not None and col in row_edits
         
         if role == Qt.DisplayRole:
             # Return edited value if exists, else original
-            if (row, col) in self._edits:
-                val = self._edits[(row, col)]
-            elif 0 <= row < len(self._data) and 0 <= col < len(self._columns):
-                val = self._data[row].get(self._columns[col])
+            if edited:
+                val = row_edits[col]
+            elif 0 <= row < self._row_count and 0 <= col < len(self._columns):
+                val = self._columns_data[col][row]
             else:
                 return None
             
@@ -289,50 +638,121 @@ class ResultsModel(QAbstractTableModel):
         
         elif role == Qt.EditRole:
             # Return raw value for editing
-            if (row, col) in self._edits:
-                return self._edits[(row, col)]
-            if 0 <= row < len(self._data) and 0 <= col < len(self._columns):
-                return self._data[row].get(self._columns[col])
+            if edited:
+                return row_edits[col]
+            if 0 <= row < self._row_count and 0 <= col < len(self._columns):
+                return self._columns_data[col][row]
         
         elif role == Qt.BackgroundRole:
             # Error rows get light red background
             if self._is_error:
-                from PySide6.QtGui import QColor
-                return QColor(255, 230, 230)  # Light red
+                return self._ERR_BG
             # Highlight edited cells with visible orange
-            if (row, col) in self._edits:
-                from PySide6.QtGui import QColor
-                return QColor(255, 200, 150)  # Soft orange - clearly visible
+            if edited:
+                return self._EDIT_BG
         
         elif role == Qt.ForegroundRole:
             # Error rows get dark red text
             if self._is_error:
-                from PySide6.QtGui import QColor
-                return QColor(180, 0, 0)  # Dark red text
+                return self._ERR_FG
         
         elif role == Qt.TextAlignmentRole:
             # Center boolean values
-            col_type = self.get_column_type(col)
-            if col_type == PG_BOOL:
-                return Qt.AlignCenter
+            if self.get_column_type(col) == PG_BOOL:
+                return self._CENTER
         
         return None
     
     def setData(self, index: QModelIndex, value, role=Qt.EditRole):
         if role == Qt.EditRole and index.isValid():
-            row, col = index.row(), index.column()
-            original = self._data[row].get(self._columns[col])
+            view_row, col = index.row(), index.column()
+            row = self._order[view_row] if self._order is not None else view_row
+            original = self._columns_data[col][row]
+            row_edits = self._edits.get(row)
+            count = self._edit_count
             
             if value != original:
-                self._edits[(row, col)] = value
-            elif (row, col) in self._edits:
-                del self._edits[(row, col)]
+                if row_edits is None:
+                    row_edits = self._edits[row] = {}
+                if col not in row_edits:
+                    self._edit_count += 1
+                row_edits[col] = value
+            elif row_edits is not None and col in row_edits:
+                del row_edits[col]
+                self._edit_count -= 1
+                if not row_edits:
+                    del self._edits[row]
+            
+            if self._bulk_rect is not None:
+                # Inside begin/end_bulk_edit: grow the dirty rect, signal once at the end
+                top, left, bottom, right = self._bulk_rect
+                self._bulk_rect = (min(top, view_row), min(left, col), max(bottom, view_row), max(right, col))
+                return True
             
             self.dataChanged.emit(index, index)
-            self.editsChanged.emit(len(self._edits))
+            if self._edit_count != count:
+                self.editsChanged.emit(self._edit_count)
             return True
         return False
     
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """Sort by swapping in a cached row permutation; stored data is never reordered."""
+        if 0 <= column < len(self._columns):
+            ascending = self._sort_cache.get(column)
+            if ascending is None:
+                ascending = self._sort_cache[column] = self._sort_permutation(column)
+            new_order = ascending if order == Qt.AscendingOrder else ascending[::-1]
+        else:
+            new_order = None  # Cleared sort indicator: back to server order
+        
+        self.layoutAboutToBeChanged.emit()
+        # Keep selection/current index on the same stored rows
+        persistent = self.persistentIndexList()
+        old = self._order
+        stored = [old[i.row()] if old is not None else i.row() for i in persistent]
+        self._order = new_order
+        if persistent:
+            if new_order is None:
+                position = range(self._row_count)
+            else:
+                position = [0] * self._row_count
+                for view_row, row in enumerate(new_order):
+                    position[row] = view_row
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(position[row], i.column()) for i, row in zip(persistent, stored)],
+            )
+        self.layoutChanged.emit()
+    
+    def _sort_permutation(self, column: int) -> list[int]:
+        """Stored row numbers ordered by a column's original values, NULLs last."""
+        values = self._columns_data[column]
+        rows = range(self._row_count)
+        if isinstance(values, array):
+            return sorted(rows, key=values.__getitem__)
+        try:
+            return sorted(rows, key=lambda i: (values[i] is None, values[i]))
+        except TypeError:
+            # Mixed value types in one column: fall back to text order
+            return sorted(rows, key=lambda i: (values[i] is None, str(values[i])))
+    
+    def begin_bulk_edit(self):
+        """Start applying many edits; signals are deferred to end_bulk_edit."""
+        if self._bulk_rect is None:
+            self._bulk_rect = (self._row_count, len(self._columns), -1, -1)
+            self._bulk_count = self._edit_count
+    
+    def end_bulk_edit(self):
+        """Emit one dataChanged over the edited area and one editsChanged."""
+        if self._bulk_rect is None:
+            return
+        top, left, bottom, right = self._bulk_rect
+        self._bulk_rect = None
+        if bottom >= 0:
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right))
+        if self._edit_count != self._bulk_count:
+            self.editsChanged.emit(self._edit_count)
+    
     def flags(self, index: QModelIndex):
         flags = super().flags(index)
         # Only editable if we have table info with primary keys
@@ -343,24 +763,31 @@ class ResultsModel(QAbstractTableModel):
     def get_pending_edits(self) -> list[tuple[str, list, str, Any]]:
         """Returns list of (pk_values, column, new_value) for pending edits."""
         edits = []
-        for (row, col), new_value in self._edits.items():
-            pk_values = [self._data[row].get(pk) for pk in self._pk_columns]
-            column = self._columns[col]
-            edits.append((pk_values, column, new_value))
+        pk_data = [self._columns_data[i] if i is not None else None for i in self._pk_indices]
+        for row, row_edits in self._edits.items():
+            pk_values = [values[row] if values is not None else None for values in pk_data]
+            for col, new_value in row_edits.items():
+                edits.append((pk_values, self._columns[col], new_value))
         return edits
     
     def clear_edits(self):
         self._edits.clear()
+        self._edit_count = 0
         self.layoutChanged.emit()
         self.editsChanged.emit(0)
     
     @property
     def has_edits(self) -> bool:
-        return bool(self._edits)
+        return self._edit_count > 0
     
     @property
     def edit_count(self) -> int:
-        return len(self._edits)
+        return self._edit_count
+    
+    @property
+    def total_rows(self) -> int:
+        """Rows received so far, including ones not yet paged into the view."""
+        return self._row_count
     
     @property
     def schema(self) -> str:
@@ -455,12 +882,14 @@ class TypeAwareDelegate(QStyledItemDelegate):
 class ConnectionDialog(QDialog):
     """Dialog for managing and selecting connections."""
     
-    def __init__(self, parent=None):
+    connectionsChanged = Signal()  # Emitted after the list is edited; owner persists it
+    
+    def __init__(self, connections: list[ConnectionInfo], parent=None):
         super().__init__(parent)
         self.setWindowTitle("Connect to Database")
         self.setMinimumWidth(400)
         
-        self.connections = load_connections()
+        self.connections = connections  # Shared with the owner, edited in place
         self.selected_info: Optional[ConnectionInfo] = None
         
         self._setup_ui()
@@ -573,7 +1002,7 @@ class ConnectionDialog(QDialog):
             self.connections.append(info)
             self.conn_combo.addItem(info.name)
         
-        save_connections(self.connections)
+        self.connectionsChanged.emit()
         
         # Select the saved connection
         idx = self.conn_combo.findText(info.name)
@@ -584,7 +1013,7 @@ class ConnectionDialog(QDialog):
         idx = self.conn_combo.currentIndex()
         if idx > 0:
             del self.connections[idx - 1]
-            save_connections(self.connections)
+            self.connectionsChanged.emit()
             self.conn_combo.removeItem(idx)
             self.conn_combo.setCurrentIndex(0)
     
@@ -596,6 +1025,24 @@ class ConnectionDialog(QDialog):
 class MainWindow(QMainWindow):
     """Main application window."""
     
+    # Message area styles for failed / successful statements
+    _STYLE_ERROR = """
+        QPlainTextEdit {
+            background-color: #fff0f0;
+            color: #cc0000;
+            border: 1px solid #ffcccc;
+            padding: 10px;
+        }
+    """
+    _STYLE_OK = """
+        QPlainTextEdit {
+            background-color: #f0fff0;
+            color: #006600;
+            border: 1px solid #ccffcc;
+            padding: 10px;
+        }
+    """
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PgKKSql")
@@ -603,6 +1050,16 @@ class MainWindow(QMainWindow):
         
         self.db = Database()
         self.worker: Optional[QueryWorker] = None
+        # One reused thread for queries; the shared connection needs them serialized
+        self._query_pool = QThreadPool(self)
+        self._query_pool.setMaxThreadCount(1)
+        self._query_running = False
+        self.connect_worker: Optional[ConnectWorker] = None
+        # Tree metadata uses its own connections (one per database, kept open)
+        # so the query session is untouched and re-expands skip the handshake
+        self._meta_dbs: dict[str, Database] = {}
+        self.meta_worker: Optional[MetadataWorker] = None
+        self._expand_queue: list[str] = []  # Databases waiting to be loaded
         self.results_model = ResultsModel()
         self._original_info: Optional[ConnectionInfo] = None
         
@@ -611,8 +1068,27 @@ class MainWindow(QMainWindow):
         self._setup_statusbar()
         self._connect_signals()
         
+        # Saved connections are read once and kept in memory for the dialog
+        self._connections = load_connections()
+        self.save_worker: Optional[SaveConnectionsWorker] = None
+        self._save_pending = False
+        self._streamed_rows = False  # Current query has delivered batch rows
+        self._msg_style: Optional[str] = None  # Stylesheet currently on message_area
+        self._completion_cache: dict[str, list[str]] = {}  # dbname -> completion words
+        self._select_queries: dict[str, dict[tuple[str, str], str]] = {}  # dbname -> (schema, table) -> SELECT
+        self._pending_dml_changes: Optional[int] = None  # Rowcount of uncommitted DML/DDL
+        self._last_rowcount = 0  # Rows in the last editable result, for edit status
+        self._tx_enabled = False  # Commit/Rollback actions are enabled
+        
+        # Coalesce edit-count status updates during bursts of cell edits
+        self._pending_status = ""
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(50)
+        self._status_timer.timeout.connect(self._refresh_status)
+        
         # Auto-connect to last used connection, or show dialog if none
-        last_conn = get_last_connection()
+        last_conn = get_last_connection(self._connections)
         if last_conn:
             self._connect_to_db(last_conn)
         else:
@@ -634,6 +1110,8 @@ class MainWindow(QMainWindow):
         self.tree.setMinimumWidth(200)
         self.tree.itemExpanded.connect(self._on_tree_expand)
         self.tree.itemDoubleClicked.connect(self._on_tree_double_click)
+        self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self._on_tree_context_menu)
         splitter.addWidget(self.tree)
         
         # Right side - editor and results
@@ -658,6 +1136,15 @@ class MainWindow(QMainWindow):
         self.results_table.setAlternatingRowColors(True)
         self.results_table.horizontalHeader().setStretchLastSection(True)
         self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.results_table.horizontalHeader().setDefaultSectionSize(120)
+        # Size columns from a sample of rows, not every row
+        self.results_table.horizontalHeader().setResizeContentsPrecision(50)
+        # Fixed row height: no per-row size hint measuring while scrolling
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.results_table.verticalHeader().setDefaultSectionSize(22)
+        # Click a header to sort; start unsorted so results keep server order
+        self.results_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
         
         # Set up type-aware delegate for editing
         self.delegate = TypeAwareDelegate(self.results_model, self.results_table)
@@ -668,7 +1155,7 @@ class MainWindow(QMainWindow):
         self.results_stack.addWidget(self.results_table)
         
         # Message area for errors/info (index 1)
-        self.message_area = QTextEdit()
+        self.message_area = QPlainTextEdit()
         self.message_area.setReadOnly(True)
         self.message_area.setFont(QFont("Consolas", 11))
         self.results_stack.addWidget(self.message_area)
@@ -720,24 +1207,91 @@ class MainWindow(QMainWindow):
         self.results_model.editsChanged.connect(self._on_edits_changed)
     
     def _show_connect_dialog(self):
-        dialog = ConnectionDialog(self)
+        dialog = ConnectionDialog(self._connections, self)
+        dialog.connectionsChanged.connect(self._save_connections)
         if dialog.exec() == QDialog.Accepted and dialog.selected_info:
             self._connect_to_db(dialog.selected_info)
     
+    def _save_connections(self):
+        """Persist the in-memory connection list without blocking on disk."""
+        if (self.save_worker and self.save_worker.isRunning()) or (
+                self.connect_worker and self.connect_worker.isRunning()):
+            # Write the latest list once this save / the connect's timestamp write finishes
+            self._save_pending = True
+            return
+        self._save_pending = False
+        self.save_worker = SaveConnectionsWorker(self._connections)
+        self.save_worker.finished.connect(self._on_connections_saved)
+        self.save_worker.start()
+    
+    def _on_connections_saved(self, error: str):
+        if error:
+            self.statusbar.showMessage(f"Failed to save connections: {error}")
+        if self._save_pending:
+            self._save_connections()
+    
+    def _is_busy(self) -> bool:
+        """True while a query or connection attempt is running in the background."""
+        return bool(
+            self._query_running
+            or (self.connect_worker and self.connect_worker.isRunning())
+        )
+    
     def _connect_to_db(self, info: ConnectionInfo):
-        try:
-            self.db.connect(info)
-            self.statusbar.showMessage(f"Connected to {info.name} ({info.host}:{info.port})")
-            self.setWindowTitle(f"PgKKSql - {info.name}")
-            update_connection_timestamp(info.name)  # Remember for next startup
-            self._load_databases()
-        except Exception as e:
-            self.statusbar.showMessage(f"Connection failed: {e}")
-            QMessageBox.critical(self, "Connection Error", str(e))
+        if self._is_busy() or (self.meta_worker and self.meta_worker.isRunning()):
+            self.statusbar.showMessage("Busy - try again when the current operation finishes")
+            return
+        
+        # An explicit (re)connect always reloads metadata from the server
+        # (and the per-database metadata pools may belong to another server)
+        self._close_meta_dbs()
+        self.db.invalidate_cache()
+        self._completion_cache.clear()
+        self._select_queries.clear()
+        
+        # The connect worker stamps the connections file; don't race a pending save
+        if self.save_worker:
+            self.save_worker.wait()
+        
+        # Connect and load metadata off the GUI thread
+        self.statusbar.showMessage(f"Connecting to {info.name} ({info.host}:{info.port})...")
+        self.connect_worker = ConnectWorker(self.db, info)
+        self.connect_worker.finished.connect(self._on_connect_finished)
+        self.connect_worker.start()
     
-    def _load_databases(self):
-        """Load all databases from the server."""
+    def _on_connect_finished(self, databases: list, words: list, error: str):
+        # Mirror the new last_connected_at so later saves don't drop it
+        timestamp = self.connect_worker.timestamp
+        if timestamp:
+            for i, c in enumerate(self._connections):
+                if c.name == self.connect_worker.info.name:
+                    self._connections[i] = replace(c, last_connected_at=timestamp)
+                    break
+        # A dialog save held back while the worker was writing the file
+        if self._save_pending:
+            self._save_connections()
+        
+        if error:
+            self.statusbar.showMessage(f"Connection failed: {error}")
+            QMessageBox.critical(self, "Connection Error", error)
+            return
+        
+        info = self.db.info
+        self.statusbar.showMessage(f"Connected to {info.name} ({info.host}:{info.port})")
+        self.setWindowTitle(f"PgKKSql - {info.name}")
+        
+        # Update autocomplete with tables and columns from current db
+        self._completion_cache[info.dbname] = words
+        self.editor.set_completion_list(words)
+        self._load_databases(databases)
+    
+    def _load_databases(self, databases: list[str]):
+        """Populate the tree with all databases on the server."""
         self.tree.clear()
+        self._expand_queue.clear()
+        if self.meta_worker:
+            self.meta_worker.wait()
+        self._close_meta_dbs()  # May point at a previous server
         if not self.db.is_connected():
             return
         
@@ -747,10 +1301,6 @@ class MainWindow(QMainWindow):
         # Update header to show connection name
         self.tree.setHeaderLabel(self.db.info.name)
         
-        # Update autocomplete with tables and columns from current db
-        self._update_completions()
-        
-        databases = self.db.get_databases()
         for dbname in databases:
             item = QTreeWidgetItem([dbname])
             item.setData(0, Qt.UserRole, ("database", dbname))
@@ -763,59 +1313,114 @@ class MainWindow(QMainWindow):
         """Update SQL editor autocomplete from current database."""
         if not self.db.is_connected():
             return
-        tables = self.db.get_all_tables()
-        columns = self.db.get_all_columns()
-        self.editor.set_completions(tables, columns)
+        dbname = self.db.info.dbname
+        words = self._completion_cache.get(dbname)
+        if words is None:
+            words = SqlEditor.build_completion_list(self.db.get_all_tables(), self.db.get_all_columns())
+            self._completion_cache[dbname] = words
+        self.editor.set_completion_list(words)
     
     def _on_tree_expand(self, item: QTreeWidgetItem):
-        """Lazy load children when item is expanded."""
+        """Lazy load schemas and tables when a database is expanded."""
         data = item.data(0, Qt.UserRole)
         if not data:
             return
         
         # Check if already loaded
-        if item.childCount() != 1 or item.child(0).text(0) != "Loading...":
+        if item.data(0, LOADED_ROLE):
             return
         
         item_type = data[0]
         
         if item_type == "database":
-            # Load schemas for this database
+            # Load schemas and their tables in the background; the
+            # "Loading..." placeholder stays until the catalog arrives
             dbname = data[1]
-            
-            # Switch to the database to get its schemas
-            self.db.switch_database(dbname)
-            
-            item.takeChildren()
-            schemas = self.db.get_schemas()
-            for schema in schemas:
-                child = QTreeWidgetItem([schema])
-                child.setData(0, Qt.UserRole, ("schema", dbname, schema))
-                placeholder = QTreeWidgetItem(["Loading..."])
-                child.addChild(placeholder)
-                item.addChild(child)
-            
-            # Switch back to original database
-            if self._original_info:
-                self.db.connect(self._original_info)
+            if dbname not in self._expand_queue:
+                self._expand_queue.append(dbname)
+            self._load_next_catalog()
+    
+    def _load_next_catalog(self):
+        """Start a metadata worker for the next queued database, if idle."""
+        if not self._expand_queue or not self._original_info:
+            return
+        if self.meta_worker and self.meta_worker.isRunning():
+            return
+        dbname = self._expand_queue[0]
+        info = replace(self._original_info, dbname=dbname)
+        self.meta_worker = MetadataWorker(self._get_or_open(dbname), info)
+        self.meta_worker.finished.connect(self._on_catalog_loaded)
+        self.meta_worker.start()
+    
+    def _get_or_open(self, dbname: str) -> Database:
+        """Return the metadata Database for dbname; the worker connects it on first use."""
+        meta_db = self._meta_dbs.get(dbname)
+        if meta_db is None:
+            meta_db = self._meta_dbs[dbname] = Database()
+        return meta_db
+    
+    def _close_meta_dbs(self):
+        for meta_db in self._meta_dbs.values():
+            meta_db.disconnect()
+        self._meta_dbs.clear()
+    
+    def _on_catalog_loaded(self, dbname: str, catalog: dict, error: str):
+        if dbname in self._expand_queue:
+            self._expand_queue.remove(dbname)
+        
+        # Find the database node (the tree may have been rebuilt meanwhile)
+        item = None
+        for i in range(self.tree.topLevelItemCount()):
+            candidate = self.tree.topLevelItem(i)
+            if candidate.data(0, Qt.UserRole) == ("database", dbname):
+                item = candidate
+                break
         
-        elif item_type == "schema":
-            # Load tables for this schema
-            dbname, schema = data[1], data[2]
-            
-            # Switch to the database to get its tables
-            self.db.switch_database(dbname)
-            
-            item.takeChildren()
-            tables = self.db.get_tables(schema)
-            for table in tables:
-                child = QTreeWidgetItem([table])
-                child.setData(0, Qt.UserRole, ("table", dbname, schema, table))
-                item.addChild(child)
-            
-            # Switch back to original database
-            if self._original_info:
-                self.db.connect(self._original_info)
+        if item and not item.data(0, LOADED_ROLE):
+            if error:
+                item.setExpanded(False)  # Collapse so the next expand retries
+                self.statusbar.showMessage(f"Failed to load {dbname}: {error}")
+            else:
+                # Build the subtree detached, then attach it in one batched call
+                schema_items = []
+                for schema, tables in catalog.items():
+                    child = QTreeWidgetItem([schema])
+                    child.setData(0, Qt.UserRole, ("schema", dbname, schema))
+                    table_items = []
+                    for table in tables:
+                        table_item = QTreeWidgetItem([table])
+                        table_item.setData(0, Qt.UserRole, ("table", dbname, schema, table))
+                        table_items.append(table_item)
+                    child.addChildren(table_items)
+                    schema_items.append(child)
+                item.takeChildren()
+                item.addChildren(schema_items)
+                item.setData(0, LOADED_ROLE, True)
+        
+        self._load_next_catalog()
+    
+    def _on_tree_context_menu(self, pos):
+        item = self.tree.itemAt(pos)
+        data = item.data(0, Qt.UserRole) if item else None
+        if not data or data[0] != "database":
+            return
+        menu = QMenu(self.tree)
+        menu.addAction("Refresh", lambda: self._refresh_tree_item(item))
+        menu.exec(self.tree.viewport().mapToGlobal(pos))
+    
+    def _refresh_tree_item(self, item: QTreeWidgetItem):
+        """Drop a database node's loaded children and reload them from the server."""
+        dbname = item.data(0, Qt.UserRole)[1]
+        meta_db = self._meta_dbs.get(dbname)
+        if meta_db:
+            meta_db.invalidate_cache()
+        self._completion_cache.pop(dbname, None)
+        self._select_queries.pop(dbname, None)
+        item.takeChildren()
+        item.addChild(QTreeWidgetItem(["Loading..."]))
+        item.setData(0, LOADED_ROLE, False)
+        if item.isExpanded():
+            self._on_tree_expand(item)
     
     def _check_uncommitted_changes(self) -> bool:
         """Check for uncommitted changes and prompt user. Returns True if OK to proceed."""
@@ -833,8 +1438,7 @@ class MainWindow(QMainWindow):
             # Rollback changes
             self.db.rollback()
             self.results_model.clear_edits()
-            self.commit_action.setEnabled(False)
-            self.rollback_action.setEnabled(False)
+            self._set_tx_enabled(False)
         return True
     
     def _on_tree_double_click(self, item: QTreeWidgetItem, column: int):
@@ -843,110 +1447,115 @@ class MainWindow(QMainWindow):
         if not data or data[0] != "table":
             return
         
+        # Switching databases reconnects; not while a worker is using the connection
+        if self._is_busy():
+            self.statusbar.showMessage("Busy - try again when the current operation finishes")
+            return
+        
         # Check for uncommitted changes first
         if not self._check_uncommitted_changes():
             return
         
         dbname, schema, table = data[1], data[2], data[3]
         
-        # Switch to the target database
-        self.db.switch_database(dbname)
-        self._original_info = self.db.info  # Update original to current
-        self.setWindowTitle(f"PgKKSql - {self.db.info.name} ({dbname})")
-        self.statusbar.showMessage(f"Switched to database: {dbname}")
-        
-        # Update autocomplete for new database
-        self._update_completions()
-        
-        # Get primary key for ORDER BY
-        pk_columns = self.db.get_primary_keys(schema, table)
+        # Switch to the target database (tables in the current one need none of this)
+        if not (self.db.is_connected() and self.db.info.dbname == dbname):
+            self.db.switch_database(dbname)
+            self._original_info = self.db.info  # Update original to current
+            self.setWindowTitle(f"PgKKSql - {self.db.info.name} ({dbname})")
+            self.statusbar.showMessage(f"Switched to database: {dbname}")
+            
+            # Update autocomplete for new database
+            self._update_completions()
         
-        query = f'SELECT * FROM "{schema}"."{table}"'
-        if pk_columns:
-            order_cols = ", ".join(f'"{pk}"' for pk in pk_columns)
-            query += f" ORDER BY {order_cols} ASC"
+        # Reuse the query built on an earlier visit to this table
+        queries = self._select_queries.setdefault(dbname, {})
+        query = queries.get((schema, table))
+        if query is None:
+            # Get primary key for ORDER BY
+            pk_columns = self.db.get_primary_keys(schema, table)
+            
+            query = f'SELECT * FROM "{schema}"."{table}"'
+            if pk_columns:
+                order_cols = ", ".join([f'"{pk}"' for pk in pk_columns])
+                query += f" ORDER BY {order_cols} ASC"
+            queries[(schema, table)] = query
         
         self.editor.setPlainText(query)
         self._execute_query(schema=schema, table=table)
     
-    def _parse_table_from_query(self, query: str) -> tuple[str, str]:
-        """
-        Try to extract schema and table from a simple SELECT query.
-        Returns (schema, table) or ("", "") if unable to parse.
-        Only works for single-table SELECTs without JOINs.
-        """
-        import re
-        
-        query_upper = query.upper()
-        
-        # Skip if it has JOINs - too complex for editing
-        if " JOIN " in query_upper:
-            return "", ""
-        
-        # Try to match: FROM "schema"."table" or FROM schema.table or FROM "table" or FROM table
-        patterns = [
-            r'FROM\s+"([^"]+)"\s*\.\s*"([^"]+)"',  # FROM "schema"."table"
-            r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)',  # FROM schema.table
-            r'FROM\s+"([^"]+)"(?:\s|$|WHERE|ORDER|GROUP|LIMIT)',  # FROM "table"
-            r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)(?:\s|$|WHERE|ORDER|GROUP|LIMIT)',  # FROM table
-        ]
-        
-        for i, pattern in enumerate(patterns):
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                if i < 2:
-                    # Schema.table patterns
-                    return match.group(1), match.group(2)
-                else:
-                    # Just table - assume public schema
-                    return "public", match.group(1)
-        
-        return "", ""
-    
     def _execute_query(self, schema: str = "", table: str = ""):
         if not self.db.is_connected():
             self.statusbar.showMessage("Not connected")
             return
         
-        if self.worker and self.worker.isRunning():
+        if self._query_running:
             self.statusbar.showMessage("Query already running...")
             return
         
+        if self.connect_worker and self.connect_worker.isRunning():
+            self.statusbar.showMessage("Still connecting...")
+            return
+        
         query = self.editor.toPlainText().strip()
         if not query:
             self.statusbar.showMessage("No query to execute")
             return
         
+        is_select = is_select_query(query)
+        
         # Check for uncommitted changes before running a new SELECT
-        if query.upper().startswith("SELECT") and self.results_model.has_edits:
+        if is_select and self.results_model.has_edits:
             if not self._check_uncommitted_changes():
                 return
         
-        # If no table info provided, try to parse from query
-        if not table and query.upper().startswith("SELECT"):
-            schema, table = self._parse_table_from_query(query)
-        
-        # Store table info for editing
-        self._pending_schema = schema
-        self._pending_table = table
-        
+        # Table detection for editing runs in the worker, off the GUI thread
         self.statusbar.showMessage("Executing...")
-        self.worker = QueryWorker(self.db, query)
-        self.worker.finished.connect(self._on_query_finished)
-        self.worker.start()
+        self.worker = QueryWorker(self.db, query, schema, table, parse_table=is_select)
+        self.worker.signals.batch.connect(self._on_query_batch)
+        self.worker.signals.finished.connect(self._on_query_finished)
+        self._streamed_rows = False
+        self._query_running = True
+        self._query_pool.start(self.worker)
+    
+    def _set_message_style(self, style: str):
+        """Apply a message area stylesheet, skipping the CSS re-parse if unchanged."""
+        if self._msg_style is not style:
+            self._msg_style = style
+            self.message_area.setStyleSheet(style)
     
-    def _on_query_finished(self, rows: list, columns: list, column_types: list, error: str, rowcount: int):
+    def _on_query_batch(self, columns_data: list, columns: list, column_types: list):
+        """Show SELECT rows as they arrive instead of after the whole result."""
+        if not self._streamed_rows:
+            self._streamed_rows = True
+            self.results_stack.setCurrentIndex(0)  # Show table
+            # No re-sorting while rows are still arriving
+            self.results_table.setSortingEnabled(False)
+            self.results_model.begin_stream(columns, column_types)
+            self.results_model.append_columns(columns_data)
+            # Size columns from the first chunk only; later chunks keep these widths
+            self._resize_result_columns(len(columns))
+        else:
+            self.results_model.append_columns(columns_data)
+        self.statusbar.showMessage(f"Executing... {self.results_model.total_rows}+ rows")
+    
+    def _resize_result_columns(self, column_count: int):
+        """Resize columns to content."""
+        # Rows are sampled; very wide results keep the default width past the first RESIZE_MAX_COLUMNS
+        for col in range(min(column_count, RESIZE_MAX_COLUMNS)):
+            self.results_table.resizeColumnToContents(col)
+    
+    def _on_query_finished(self, rows: list, columns: list, column_types: list, error: str, rowcount: int,
+                           schema: str, table: str, has_join: bool):
+        self._query_running = False
         if error:
+            if self._streamed_rows:
+                # Don't leave a partial result behind the error message
+                self.results_model.clear()
+                self.results_table.setSortingEnabled(True)
             # Show error in message area
-            self.message_area.setStyleSheet("""
-                QTextEdit {
-                    background-color: #fff0f0;
-                    color: #cc0000;
-                    border: 1px solid #ffcccc;
-                    padding: 10px;
-                }
-            """)
-            self.message_area.setText(f"❌ Query Error:\n\n{error}")
+            self._set_message_style(self._STYLE_ERROR)
+            self.message_area.setPlainText(f"❌ Query Error:\n\n{error}")
             self.results_stack.setCurrentIndex(1)  # Show message area
             self.statusbar.showMessage("Query failed - see error below")
             return
@@ -954,12 +1563,14 @@ class MainWindow(QMainWindow):
         if columns:
             # SELECT query - show results table
             self.results_stack.setCurrentIndex(0)  # Show table
-            self.results_model.set_data(rows, columns, column_types)
+            if self._streamed_rows:
+                self.results_model.finish_stream()
+            else:
+                self.results_model.set_data(rows, columns, column_types)
+            self.results_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self.results_table.setSortingEnabled(True)
             
             # Set table info if we have it
-            schema = getattr(self, '_pending_schema', '')
-            table = getattr(self, '_pending_table', '')
-            
             if schema and table:
                 pk_columns = self.db.get_primary_keys(schema, table)
                 self.results_model.set_table_info(schema, table, pk_columns)
@@ -971,9 +1582,11 @@ class MainWindow(QMainWindow):
                 pk_columns = []
                 editable = False
             
-            msg = f"{rowcount} row{'s' if rowcount != 1 else ''}"
+            msg = _rows_text(rowcount)
             if rowcount == 1000:
-                msg += " (limited)"
+                # Estimate from pg_class instead of a COUNT(*) scan
+                approx = self.db.get_approx_rowcount(schema, table) if schema and table else None
+                msg += f" (limited, ~{approx:,} in table)" if approx else " (limited)"
             
             if editable:
                 msg += f" • {schema}.{table} • Double-click to edit"
@@ -981,56 +1594,66 @@ class MainWindow(QMainWindow):
                 msg += f" • {schema}.{table} • Read-only (no primary key)"
             else:
                 # Check if it's a JOIN query
-                query = self.editor.toPlainText().upper()
-                if " JOIN " in query:
+                if has_join:
                     msg += " • Read-only (JOINs not editable)"
                 else:
                     msg += " • Read-only (table not detected)"
             
             self.statusbar.showMessage(msg)
             
-            # Resize columns to content
-            self.results_table.resizeColumnsToContents()
+            if not self._streamed_rows:
+                self._resize_result_columns(len(columns))
         else:
             # DML query (UPDATE/INSERT/DELETE) - show success message
-            self.message_area.setStyleSheet("""
-                QTextEdit {
-                    background-color: #f0fff0;
-                    color: #006600;
-                    border: 1px solid #ccffcc;
-                    padding: 10px;
-                }
-            """)
-            self.message_area.setText(f"✅ Query executed successfully\n\n{rowcount} row{'s' if rowcount != 1 else ''} affected\n\nClick 'Commit' to save changes or 'Rollback' to discard.")
+            self._set_message_style(self._STYLE_OK)
+            self.message_area.setPlainText(f"✅ Query executed successfully\n\n{_rows_text(rowcount)} affected\n\nClick 'Commit' to save changes or 'Rollback' to discard.")
             self.results_stack.setCurrentIndex(1)  # Show message area
             
             self._pending_dml_changes = rowcount
-            msg = f"{rowcount} row{'s' if rowcount != 1 else ''} affected (uncommitted)"
+            msg = f"{_rows_text(rowcount)} affected (uncommitted)"
             self.statusbar.showMessage(msg)
             # Enable commit/rollback buttons
-            self.commit_action.setEnabled(True)
-            self.rollback_action.setEnabled(True)
+            self._set_tx_enabled(True)
     
     def _on_edits_changed(self, edit_count: int):
         """Update UI when cell edits change."""
         has_edits = edit_count > 0
-        self.commit_action.setEnabled(has_edits)
-        self.rollback_action.setEnabled(has_edits)
+        self._set_tx_enabled(has_edits)
         
         # Update status bar to show edit count
         if has_edits:
-            rowcount = getattr(self, '_last_rowcount', 0)
-            msg = f"{rowcount} row{'s' if rowcount != 1 else ''}"
+            rowcount = self._last_rowcount
+            msg = _rows_text(rowcount)
             msg += f" • {edit_count} cell{'s' if edit_count != 1 else ''} edited (uncommitted)"
-            self.statusbar.showMessage(msg)
-        elif self.results_model.rowCount() > 0:
-            rowcount = getattr(self, '_last_rowcount', self.results_model.rowCount())
-            msg = f"{rowcount} row{'s' if rowcount != 1 else ''}"
+            self._pending_status = msg
+            if not self._status_timer.isActive():
+                self._status_timer.start()
+            return
+        
+        # Edits cleared: show now, and don't let a queued edit count overwrite later messages
+        self._status_timer.stop()
+        if self.results_model.rowCount() > 0:
+            rowcount = self._last_rowcount or self.results_model.rowCount()
+            msg = _rows_text(rowcount)
             if self.results_model.table:
                 msg += " • Double-click to edit"
             self.statusbar.showMessage(msg)
     
+    def _set_tx_enabled(self, on: bool):
+        """Enable or disable Commit/Rollback, skipping the Qt calls if unchanged."""
+        if self._tx_enabled == on:
+            return
+        self._tx_enabled = on
+        self.commit_action.setEnabled(on)
+        self.rollback_action.setEnabled(on)
+    
+    def _refresh_status(self):
+        self.statusbar.showMessage(self._pending_status)
+    
     def _commit_changes(self):
+        if self._is_busy():
+            self.statusbar.showMessage("Busy - try again when the current operation finishes")
+            return
         # Handle cell edits in result grid
         if self.results_model.has_edits:
             schema = self.results_model.schema
@@ -1042,13 +1665,11 @@ class MainWindow(QMainWindow):
                                   "No primary key detected. Updates not supported for this query.")
                 return
             
-            errors = []
-            edits = self.results_model.get_pending_edits()
-            
-            for pk_values, column, new_value in edits:
-                error = self.db.execute_update(schema, table, pk_columns, pk_values, column, new_value)
-                if error:
-                    errors.append(error)
+            # Send all edits in one pipelined round-trip
+            errors = self.db.execute_updates([
+                (schema, table, pk_columns, pk_values, column, new_value)
+                for pk_values, column, new_value in self.results_model.get_pending_edits()
+            ])
             
             if errors:
                 self.db.rollback()
@@ -1060,15 +1681,22 @@ class MainWindow(QMainWindow):
         
         # Commit transaction (for both cell edits and DML queries)
         self.db.commit()
-        self.commit_action.setEnabled(False)
-        self.rollback_action.setEnabled(False)
+        if self._pending_dml_changes is not None:
+            # Committed statements may have created or dropped tables/columns
+            self._completion_cache.pop(self.db.info.dbname, None)
+            self._select_queries.pop(self.db.info.dbname, None)
+            self._pending_dml_changes = None
+        self._set_tx_enabled(False)
         self.statusbar.showMessage("Changes committed")
     
     def _rollback_changes(self):
+        if self._is_busy():
+            self.statusbar.showMessage("Busy - try again when the current operation finishes")
+            return
         self.db.rollback()
+        self._pending_dml_changes = None
         self.results_model.clear_edits()
-        self.commit_action.setEnabled(False)
-        self.rollback_action.setEnabled(False)
+        self._set_tx_enabled(False)
         self.statusbar.showMessage("Changes rolled back")
     
     def closeEvent(self, event):
@@ -1083,6 +1711,21 @@ class MainWindow(QMainWindow):
                 event.ignore()
                 return
         
+        if self._query_running and self.db.is_connected():
+            # Don't hang the close on a long query
+            self.db.conn.cancel()
+        self._query_pool.waitForDone()
+        # A connect in progress is bounded by CONNECT_TIMEOUT; don't disconnect under it
+        if self.connect_worker:
+            self.connect_worker.wait()
+        if self.meta_worker:
+            self.meta_worker.wait()
+        if self.save_worker:
+            self.save_worker.wait()
+        if self._save_pending:
+            # Held back for a worker that finished after the event loop stopped
+            save_connections(self._connections)
+        self._close_meta_dbs()
         self.db.disconnect()
         event.accept()
 